@@ -0,0 +1,335 @@
+"""
+Credential parsers for archive members
+Author: Leandro Malaquias
+Purpose: For legitimate cybersecurity research and threat intelligence
+
+Kept free of Telegram/database code and fully annotated so it can be
+compiled ahead of time for the hot parsing loops:
+
+    pip install mypy && mypyc parsers.py
+
+The resulting extension module is imported in place of this file when
+present; without it this pure-Python version is used unchanged.
+"""
+
+import csv
+import io
+import itertools
+import json
+import logging
+import re
+from datetime import datetime
+from typing import IO, Any, Iterable, Iterator, List, Literal, Optional, Tuple
+
+# orjson parses straight from bytes and is 2-3x faster than the stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+# One parsed credential, in the column order of the creds table
+Row = Tuple[str, str, str, str, str, str, str, str, int]
+
+# One credential per line, either email:password or
+# email;password;additional_info, with optional blanks around the
+# separator. Groups: email, ':' (empty for the ';' form), colon password,
+# semicolon password, additional info
+_CRED_RE = re.compile(
+    rb'(?m)^[\t ]*([^\s:;@]+@[^\s:;]+)[\t ]*'
+    rb'(?:(:)([^\r\n]*)|;([^;\r\n]*);?([^\r\n]*))'
+)
+
+# Delimiters considered when sniffing .csv members, and the sample size
+CSV_DELIMITERS = ',;:\t|'
+CSV_SNIFF_SIZE = 4096
+
+# A whole field in double quotes, closed on the same line; quoting is only
+# turned on when the sample has one
+_CSV_QUOTED_RE = re.compile(
+    r'(?m)(?:^|[%s]) *"[^"\r\n]*" *(?:[%s]|$)' % ((re.escape(CSV_DELIMITERS),) * 2)
+)
+
+# Archive members are parsed in blocks of about this size
+STREAM_BLOCK_SIZE = 1 << 20
+
+# Decompression-bomb guard: largest member decompressed, whether by
+# declared or actual size
+MAX_MEMBER_SIZE = 256 << 20
+
+logger = logging.getLogger(__name__)
+
+
+def _json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def _iter_blocks(stream: IO[bytes]) -> Iterator[bytes]:
+    """Yield successive blocks of stream, each ending on a line boundary"""
+    # Pieces of the current unfinished line, joined once it ends so long
+    # lines are not recopied for every block read
+    pending: List[bytes] = []
+    total = 0
+    while True:
+        chunk = stream.read(STREAM_BLOCK_SIZE)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > MAX_MEMBER_SIZE:
+            raise ValueError(f"member exceeds {MAX_MEMBER_SIZE} bytes when decompressed")
+        cut = chunk.rfind(b'\n') + 1
+        if not cut:
+            pending.append(chunk)
+            continue
+        pending.append(chunk[:cut])
+        yield b''.join(pending)
+        pending = [chunk[cut:]]
+    tail = b''.join(pending)
+    if tail:
+        yield tail
+
+
+class _LimitedReader(io.RawIOBase):
+    """Raw reader over a member stream that enforces MAX_MEMBER_SIZE"""
+    
+    def __init__(self, stream: Any) -> None:
+        self._stream = stream
+        self._total = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer: Any) -> int:
+        count: int = self._stream.readinto(buffer)
+        self._total += count
+        if self._total > MAX_MEMBER_SIZE:
+            raise ValueError(f"member exceeds {MAX_MEMBER_SIZE} bytes when decompressed")
+        return count
+
+
+def _ingest_timestamp() -> str:
+    """Timestamp shared by every row parsed from one file, as stored in SQLite"""
+    return datetime.now().isoformat(sep=' ')
+
+
+def _read_limited(stream: IO[bytes]) -> bytes:
+    """Read a whole stream, refusing to go past MAX_MEMBER_SIZE"""
+    content = stream.read(MAX_MEMBER_SIZE + 1)
+    if len(content) > MAX_MEMBER_SIZE:
+        raise ValueError(f"member exceeds {MAX_MEMBER_SIZE} bytes when decompressed")
+    return content
+
+
+def _recorded(lines: Iterable[str], consumed: List[str]) -> Iterator[str]:
+    """Pass lines through, appending each one to consumed"""
+    for line in lines:
+        consumed.append(line)
+        yield line
+
+
+def _unquoted_rows(lines: Iterable[str], dialect: Any, delimiter: str) -> Iterator[List[str]]:
+    """Read lines one at a time with quoting off, skipping any csv rejects"""
+    for line in lines:
+        try:
+            yield from csv.reader([line], dialect, delimiter=delimiter, quoting=csv.QUOTE_NONE)
+        except csv.Error:
+            continue
+
+
+def _csv_rows(lines: Iterable[str], dialect: Any, delimiter: str,
+              quoting: Literal[0, 3]) -> Iterator[List[str]]:
+    """Yield CSV rows, re-reading without quoting any record that spans lines
+
+    A password starting with '"' would otherwise open a quoted field that
+    swallows every line up to the next quote, or runs into csv.Error at
+    the field size limit. Genuine multi-line fields are rare in dumps and
+    are split into lines the same way.
+    """
+    consumed: List[str] = []
+    source = _recorded(lines, consumed)
+    while True:
+        try:
+            for row in csv.reader(source, dialect, delimiter=delimiter, quoting=quoting):
+                if len(consumed) > 1:
+                    yield from _unquoted_rows(consumed, dialect, delimiter)
+                else:
+                    yield row
+                consumed.clear()
+            return
+        except csv.Error:
+            if not consumed:
+                return
+            # Re-read the failed record's lines, then carry on after them
+            yield from _unquoted_rows(consumed, dialect, delimiter)
+            consumed.clear()
+
+
+def process_extracted_content(members: Iterable[Tuple[str, IO[bytes]]],
+                              message_id: int) -> List[Row]:
+    """Parse credentials from archive members one at a time"""
+    processed_data: List[Row] = []
+    
+    for filename, stream in members:
+        name = filename.lower()
+        
+        try:
+            # Different parsing strategies based on file type
+            if name.endswith('.txt'):
+                processed_data.extend(parse_credential_stream(stream, filename, message_id))
+            
+            elif name.endswith('.csv'):
+                processed_data.extend(parse_csv_stream(stream, filename, message_id))
+            
+            elif name.endswith('.json'):
+                content = _read_limited(stream)
+                try:
+                    json_data = _json_loads(content)
+                    processed_data.extend(parse_json_credentials(json_data, filename, message_id))
+                except Exception:
+                    pass
+        
+        except Exception as e:
+            # A corrupt member (bad CRC, truncated data, size guard) only
+            # costs its own rows, not the rest of the archive
+            logger.warning(f"Skipping {filename}: {e}")
+    
+    return processed_data
+
+
+def parse_credential_stream(stream: IO[bytes], filename: str, message_id: int) -> List[Row]:
+    """Parse credential data block by block from a binary stream"""
+    parsed_data: List[Row] = []
+    timestamp = _ingest_timestamp()
+    
+    for block in _iter_blocks(stream):
+        parsed_data.extend(parse_credential_data(block, filename, message_id, timestamp))
+    
+    return parsed_data
+
+
+def parse_csv_stream(stream: IO[bytes], filename: str, message_id: int) -> List[Row]:
+    """Parse credentials from a CSV member using a sniffed dialect"""
+    parsed_data: List[Row] = []
+    timestamp = _ingest_timestamp()
+    
+    text = io.TextIOWrapper(
+        io.BufferedReader(_LimitedReader(stream), STREAM_BLOCK_SIZE),
+        encoding='utf-8', errors='ignore', newline=''
+    )
+    
+    # Sniff on a sample completed to a whole line, then replay it
+    sample = text.read(CSV_SNIFF_SIZE)
+    sample += text.readline()
+    dialect: Any
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS)
+        delimiter: str = dialect.delimiter
+    except csv.Error:
+        # Ragged rows defeat the sniffer; use the most frequent delimiter
+        dialect = csv.excel
+        delimiter = max(CSV_DELIMITERS, key=sample.count)
+    quoting: Literal[0, 3] = csv.QUOTE_MINIMAL if _CSV_QUOTED_RE.search(sample) else csv.QUOTE_NONE
+    lines = itertools.chain(io.StringIO(sample, newline=''), text)
+    
+    for row in _csv_rows(lines, dialect, delimiter, quoting):
+        # First cell with an '@' is the email, the next one the password
+        index = 0
+        while index < len(row) and '@' not in row[index]:
+            index += 1
+        if index == len(row):
+            continue
+        
+        if delimiter == ':':
+            # email:password lists: the password runs to the end of the
+            # line, as in the plain-text parser
+            password = ':'.join(row[index + 1:]).strip()
+            additional = ''
+        else:
+            password = row[index + 1].strip() if index + 1 < len(row) else ''
+            additional = ';'.join(row[index + 2:])
+        
+        email = row[index].strip()
+        parsed_data.append((
+            timestamp,
+            filename,
+            'credentials',
+            'csv',
+            email,
+            email.rpartition('@')[2],
+            password,
+            additional,
+            message_id
+        ))
+    
+    return parsed_data
+
+
+def parse_credential_data(content: bytes, filename: str, message_id: int,
+                          timestamp: Optional[str] = None) -> List[Row]:
+    """Parse credential data from raw text content"""
+    if timestamp is None:
+        timestamp = _ingest_timestamp()
+    ts: str = timestamp
+    
+    # findall extracts every field in one C-level pass, so the only
+    # Python work left per credential is building its row tuple
+    return [
+        (
+            ts,
+            filename,
+            'credentials',
+            'email:password' if colon else 'email;password;info',
+            email.decode('utf-8', errors='ignore'),
+            email.rpartition(b'@')[2].decode('utf-8', errors='ignore'),
+            (colon_password if colon else password).strip().decode('utf-8', errors='ignore'),
+            additional.decode('utf-8', errors='ignore'),
+            message_id
+        )
+        for email, colon, colon_password, password, additional in _CRED_RE.findall(content)
+    ]
+
+
+def parse_json_credentials(json_data: Any, filename: str, message_id: int,
+                           timestamp: Optional[str] = None) -> List[Row]:
+    """Parse credentials from JSON data"""
+    parsed_data: List[Row] = []
+    if timestamp is None:
+        timestamp = _ingest_timestamp()
+    ts: str = timestamp
+    
+    # Repeats within one file would be dropped by the database's
+    # UNIQUE(email, password) anyway; skip them before serializing
+    seen = set()
+    
+    # Handle different JSON structures
+    if isinstance(json_data, list):
+        for item in json_data:
+            if isinstance(item, dict) and 'email' in item:
+                email = item.get('email', '')
+                if isinstance(email, str) and '@' in email:
+                    password = str(item.get('password') or '')
+                    if (email, password) in seen:
+                        continue
+                    seen.add((email, password))
+                    
+                    domain = email.split('@')[1]
+                    parsed_data.append((
+                        ts,
+                        filename,
+                        'credentials',
+                        'json',
+                        email,
+                        domain,
+                        password,
+                        _json_dumps(item),
+                        message_id
+                    ))
+    
+    return parsed_data
@@ -6,34 +6,165 @@ Purpose: For legitimate cybersecurity research and threat intelligence
 """
 
 import asyncio
+import atexit
+import concurrent.futures
+import io
 import os
+import sqlite3
+import tempfile
 import zipfile
 import rarfile
 import pandas as pd
 from telethon import TelegramClient, events
 from telethon.tl.types import MessageMediaDocument
 import logging
-from datetime import datetime
-import json
+from parsers import MAX_MEMBER_SIZE, process_extracted_content
+
+# Telethon picks up cryptg automatically; it moves MTProto AES-IGE to C
+# and roughly doubles download throughput
+try:
+    import cryptg  # noqa: F401
+    HAS_CRYPTG = True
+except ImportError:
+    HAS_CRYPTG = False
+
+# ISA-L's inflate and CRC32 use SIMD/carry-less multiply instructions;
+# zipfile looks up zlib and crc32 as module globals, so swap both in
+try:
+    from isal import isal_zlib
+    zipfile.zlib = isal_zlib
+    zipfile.crc32 = isal_zlib.crc32
+except ImportError:
+    pass
+
+# Column order of the output records; parsed rows are plain tuples in
+# this order
+COLUMNS = [
+    'timestamp', 'filename', 'file_type', 'content_type',
+    'email', 'domain', 'password', 'additional_data', 'source_message_id'
+]
+
+# The UNIQUE constraint does the (email, password) dedup on insert
+CREATE_CREDS_TABLE = """
+CREATE TABLE IF NOT EXISTS creds (
+    timestamp TEXT,
+    filename TEXT,
+    file_type TEXT,
+    content_type TEXT,
+    email TEXT,
+    domain TEXT,
+    password TEXT,
+    additional_data TEXT,
+    source_message_id INTEGER,
+    UNIQUE(email, password)
+)
+"""
+INSERT_CRED = (
+    "INSERT OR IGNORE INTO creds VALUES "
+    f"({', '.join('?' * len(COLUMNS))})"
+)
+
+# Single-row table holding the ID of the last processed channel message
+CREATE_STATE_TABLE = """
+CREATE TABLE IF NOT EXISTS state (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    last_id INTEGER NOT NULL
+)
+"""
+
+# Download tuning: request size per getFile call, the size below which a
+# single stream is used, and the worker cap that keeps clear of FLOOD_WAIT
+DOWNLOAD_PART_SIZE = 512 * 1024
+PARALLEL_MIN_SIZE = 4 << 20
+MAX_DOWNLOAD_WORKERS = 4
+
+# Archives downloaded at once when no download sessions are configured,
+# cap on getFile requests in flight across all sessions, and archives
+# parsed at once on worker threads
+MAX_CONCURRENT_DOWNLOADS = 2
+MAX_INFLIGHT_REQUESTS = 10
+MAX_PARSE_WORKERS = 4
+
+# RAR archives up to this size are kept in memory, larger ones on disk
+RAR_SPOOL_SIZE = 64 << 20
+
+# Message attachments treated as archives
+_COMPRESSED_EXTS = ('.zip', '.rar', '.7z', '.tar.gz', '.tar.bz2')
+
+# Archive members worth parsing; everything else is never decompressed
+PARSED_EXTENSIONS = ('.txt', '.csv', '.json')
+
+# Decompression-bomb guard: largest archive downloaded (the per-member
+# limit, MAX_MEMBER_SIZE, lives with the parsers)
+MAX_ARCHIVE_SIZE = 1 << 30
+
 
 class TelegramChannelMonitor:
-    def __init__(self, api_id, api_hash, channel_username, excel_file):
+    def __init__(self, api_id, api_hash, channel_username, db_path, download_sessions=None,
+                 backfill_history=False):
         self.client = TelegramClient('session', api_id, api_hash)
         self.channel_username = channel_username
-        self.excel_file = excel_file
-        self.download_folder = 'downloads'
-        self.processed_folder = 'processed'
+        self.db_path = db_path
+        self.backfill_history = backfill_history
+        
+        # Extra sessions that only download, so archives are fetched over
+        # several connections while self.client keeps receiving events
+        self.download_clients = [
+            TelegramClient(name, api_id, api_hash) for name in (download_sessions or [])
+        ]
+        
+        # IDs of messages already ingested or currently being processed
+        self.processed_ids = set()
+        
+        # Rows buffered for the next batch insert
+        self._rows = []
+        self._flush_every = 500
+        
+        # Idle download clients, one entry per download slot; the parallel
+        # workers per download are sized so all slots together stay within
+        # MAX_INFLIGHT_REQUESTS
+        slots = self.download_clients or [self.client] * MAX_CONCURRENT_DOWNLOADS
+        self._idle_clients = asyncio.Queue()
+        for client in slots:
+            self._idle_clients.put_nowait(client)
+        self._download_workers = max(1, min(MAX_DOWNLOAD_WORKERS, MAX_INFLIGHT_REQUESTS // len(slots)))
+        
+        # Backfill keeps this many messages started ahead of the download slots
+        self._backfill_window = 2 * len(slots)
+        
+        # Decompression and parsing run on worker threads so the event loop
+        # keeps receiving messages; in-flight message tasks are tracked here
+        self._cpu_sema = asyncio.Semaphore(MAX_PARSE_WORKERS)
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_PARSE_WORKERS)
+        self._tasks = set()
         
         # Setup logging
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
         self.logger = logging.getLogger(__name__)
         
-        # Create directories
-        os.makedirs(self.download_folder, exist_ok=True)
-        os.makedirs(self.processed_folder, exist_ok=True)
+        if not HAS_CRYPTG:
+            self.logger.warning("cryptg not installed; downloads will use slow pure-Python "
+                                "encryption. Install cryptg for ~2x MTProto throughput")
+        
+        # Open the credentials database
+        self._db = sqlite3.connect(self.db_path, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(CREATE_CREDS_TABLE)
+        self._db.execute(CREATE_STATE_TABLE)
+        # A newly created state row means a new database; see backfill()
+        self._new_state = self._db.execute('INSERT OR IGNORE INTO state VALUES (0, 0)').rowcount == 1
+        
+        # Message cursor: the highest finished message ID, saved with the
+        # next flush. Messages still in flight or that failed are kept in
+        # _unfinished_ids and hold the saved value below them, so a
+        # restart's backfill comes back to them
+        self.last_id = self._db.execute('SELECT last_id FROM state').fetchone()[0]
+        self._saved_last_id = self.last_id
+        self._unfinished_ids = set()
         
-        # Initialize Excel file if not exists
-        self.init_excel()
+        # Don't lose buffered rows if the process exits without aclose()
+        atexit.register(self.close_sink)
     
     async def test_connection(self):
         """Test connection and channel access"""
@@ -57,20 +188,40 @@ class TelegramChannelMonitor:
             print(f"✗ Connection test failed: {e}")
             return False
     
-    def init_excel(self):
-        """Initialize Excel file with headers"""
-        if not os.path.exists(self.excel_file):
-            df = pd.DataFrame(columns=[
-                'timestamp', 'filename', 'file_type', 'content_type', 
-                'email', 'domain', 'password', 'additional_data', 'source_message_id'
-            ])
-            df.to_excel(self.excel_file, index=False)
+    def close_sink(self):
+        """Flush buffered rows and close the database"""
+        if self._db is None:
+            return
+        self._flush()
+        self._db.close()
+        self._db = None
+    
+    def _parse_members(self, archive, filename, message_id):
+        """Parse archive members; runs on a parse worker"""
+        # The archive buffer is closed here rather than by the waiting
+        # coroutine, which may be cancelled while this is still reading it
+        with archive:
+            return process_extracted_content(self.iter_members(archive, filename), message_id)
+    
+    async def aclose(self):
+        """Stop in-flight messages and the parse workers, flush and close the output, disconnect downloaders"""
+        # Cancelled messages are not marked done, so the next run's
+        # backfill picks them up again
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await asyncio.to_thread(self._pool.shutdown, wait=True, cancel_futures=True)
+        self.close_sink()
+        for client in self.download_clients:
+            await client.disconnect()
     
     async def start_monitoring(self):
         """Start monitoring the Telegram channel"""
         try:
             print("Connecting to Telegram...")
             await self.client.start()
+            for client in self.download_clients:
+                await client.start()
             print("Connected successfully!")
             
             self.logger.info(f"Started monitoring channel: {self.channel_username}")
@@ -88,10 +239,14 @@ class TelegramChannelMonitor:
             @self.client.on(events.NewMessage(chats=channel))
             async def handle_new_message(event):
                 try:
-                    await self.process_message(event.message)
+                    # Don't block the next event while this archive is processed
+                    self._start_task(event.message)
                 except Exception as e:
                     self.logger.error(f"Error handling message: {e}")
             
+            # Catch up on messages posted while the monitor was down
+            await self.backfill(channel)
+            
             print("Monitoring started. Press Ctrl+C to stop...")
             
             # Keep the client running
@@ -101,8 +256,51 @@ class TelegramChannelMonitor:
             self.logger.error(f"Error in start_monitoring: {e}")
             raise
     
+    def _start_task(self, message):
+        """Process a message in the background, tracked for shutdown"""
+        task = asyncio.create_task(self.process_message(message))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+    
+    async def backfill(self, channel):
+        """Process messages newer than the saved cursor, oldest first"""
+        if self._new_state and not self.backfill_history:
+            # A new database starts at the channel's newest message rather
+            # than downloading the whole history
+            latest = await self.client.get_messages(channel, limit=1)
+            if latest:
+                self.last_id = max(self.last_id, latest[0].id)
+                self._flush()
+            self.logger.info(f"New database: starting after message {self.last_id} "
+                             "(set backfill_history to process older messages)")
+            return
+        
+        self.logger.info(f"Backfilling messages after ID {self.last_id}")
+        count = 0
+        pending = set()
+        
+        async for message in self.client.iter_messages(channel, min_id=self.last_id, reverse=True):
+            # Same tasks and download slots as live messages, with only a
+            # window of them started at a time
+            pending.add(self._start_task(message))
+            if len(pending) >= self._backfill_window:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            count += 1
+        
+        if pending:
+            await asyncio.wait(pending)
+        self._flush()
+        self.logger.info(f"Backfill complete: {count} messages checked")
+    
     async def process_message(self, message):
         """Process new messages from the channel"""
+        if message.id in self.processed_ids:
+            return
+        self.processed_ids.add(message.id)
+        self._unfinished_ids.add(message.id)
+        
+        ok = True
         try:
             if message.media and isinstance(message.media, MessageMediaDocument):
                 document = message.media.document
@@ -115,218 +313,253 @@ class TelegramChannelMonitor:
                         break
                 
                 if filename and self.is_compressed_file(filename):
-                    self.logger.info(f"Found compressed file: {filename}")
-                    await self.download_and_process(message, filename)
+                    if document.size > MAX_ARCHIVE_SIZE:
+                        self.logger.warning(f"Skipping {filename}: {document.size} bytes "
+                                            f"exceeds the {MAX_ARCHIVE_SIZE} byte limit")
+                    else:
+                        self.logger.info(f"Found compressed file: {filename}")
+                        ok = await self.download_and_process(message, filename)
                     
         except Exception as e:
             self.logger.error(f"Error processing message: {e}")
+            ok = False
+        
+        # A cancelled message raises past this point and stays unfinished
+        if ok:
+            self._unfinished_ids.discard(message.id)
+            self.last_id = max(self.last_id, message.id)
+        else:
+            # Keep holding the cursor back, and allow a later backfill or
+            # retry to pick it up again
+            self.processed_ids.discard(message.id)
     
     def is_compressed_file(self, filename):
         """Check if file is compressed"""
-        compressed_extensions = ['.zip', '.rar', '.7z', '.tar.gz', '.tar.bz2']
-        return any(filename.lower().endswith(ext) for ext in compressed_extensions)
+        return filename.lower().endswith(_COMPRESSED_EXTS)
     
     async def download_and_process(self, message, filename):
-        """Download and process compressed file"""
+        """Download compressed file into memory and process it"""
         try:
-            # Download file
-            download_path = os.path.join(self.download_folder, filename)
-            await self.client.download_media(message, download_path)
-            self.logger.info(f"Downloaded: {filename}")
-            
-            # Decompress and process
-            extracted_content = self.decompress_file(download_path)
+            document = message.media.document
             
-            # Process extracted content
-            processed_data = self.process_extracted_content(extracted_content, message.id)
+            # RAR members may be handed to the external unrar tool, so large
+            # RAR archives go to a preallocated temporary file instead of RAM
+            if filename.lower().endswith('.rar'):
+                if document.size > RAR_SPOOL_SIZE:
+                    buffer = tempfile.TemporaryFile()
+                    if hasattr(os, 'posix_fallocate'):
+                        os.posix_fallocate(buffer.fileno(), 0, document.size)
+                else:
+                    buffer = tempfile.SpooledTemporaryFile(max_size=RAR_SPOOL_SIZE)
+            else:
+                buffer = io.BytesIO()
             
-            # Add to Excel
-            self.add_to_excel(processed_data)
+            handed_off = False
+            try:
+                # Download file on the next idle client
+                client = await self._idle_clients.get()
+                try:
+                    await self.parallel_download(
+                        document, buffer, self._download_workers, client=client
+                    )
+                except Exception as e:
+                    if client is self.client:
+                        raise
+                    # The document's file reference came from the main
+                    # session, which can always fetch it
+                    self.logger.warning(f"Download session failed on {filename} ({e}); "
+                                        "retrying on the main session")
+                    buffer.seek(0)
+                    buffer.truncate()
+                    await self.parallel_download(document, buffer, self._download_workers)
+                finally:
+                    self._idle_clients.put_nowait(client)
+                buffer.seek(0)
+                self.logger.info(f"Downloaded: {filename}")
+                
+                # Decompress and parse member by member on a worker thread,
+                # which then closes the buffer
+                async with self._cpu_sema:
+                    loop = asyncio.get_running_loop()
+                    future = loop.run_in_executor(
+                        self._pool, self._parse_members, buffer, filename, message.id
+                    )
+                    handed_off = True
+                    processed_data = await future
+            finally:
+                if not handed_off:
+                    buffer.close()
             
-            # Move processed file
-            processed_path = os.path.join(self.processed_folder, filename)
-            os.rename(download_path, processed_path)
+            # Add to output dataset
+            self.add_to_sink(processed_data)
             
-            self.logger.info(f"Processed and moved: {filename}")
+            self.logger.info(f"Processed: {filename}")
+            return True
             
         except Exception as e:
             self.logger.error(f"Error downloading/processing {filename}: {e}")
+            return False
     
-    def decompress_file(self, file_path):
-        """Decompress file and return content"""
-        extracted_content = []
+    async def parallel_download(self, document, buffer, workers=MAX_DOWNLOAD_WORKERS, client=None):
+        """Download a document into buffer using concurrent offset ranges"""
+        client = client or self.client
+        size = document.size
+        workers = min(workers, MAX_DOWNLOAD_WORKERS)
         
-        try:
-            if file_path.endswith('.zip'):
-                with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                    for file_info in zip_ref.filelist:
-                        if not file_info.is_dir():
-                            with zip_ref.open(file_info) as f:
-                                content = f.read().decode('utf-8', errors='ignore')
-                                extracted_content.append({
-                                    'filename': file_info.filename,
-                                    'content': content
-                                })
-            
-            elif file_path.endswith('.rar'):
-                with rarfile.RarFile(file_path) as rar_ref:
-                    for file_info in rar_ref.infolist():
-                        if not file_info.is_dir():
-                            content = rar_ref.read(file_info).decode('utf-8', errors='ignore')
-                            extracted_content.append({
-                                'filename': file_info.filename,
-                                'content': content
-                            })
-                            
-        except Exception as e:
-            self.logger.error(f"Error decompressing {file_path}: {e}")
+        # Small files: the extra requests cost more than they save
+        if size < PARALLEL_MIN_SIZE or workers < 2:
+            async for chunk in client.iter_download(
+                document, request_size=DOWNLOAD_PART_SIZE
+            ):
+                buffer.write(chunk)
+            return
         
-        return extracted_content
-    
-    def process_extracted_content(self, extracted_content, message_id):
-        """Process extracted content and parse credentials"""
-        processed_data = []
+        # Preallocate so every worker can write at its own offset
+        buffer.seek(size - 1)
+        buffer.write(b'\0')
         
-        for file_data in extracted_content:
-            content = file_data['content']
-            filename = file_data['filename']
-            
-            # Different parsing strategies based on file type
-            if filename.endswith('.txt') or filename.endswith('.csv'):
-                parsed_data = self.parse_credential_data(content, filename, message_id)
-                processed_data.extend(parsed_data)
-            
-            elif filename.endswith('.json'):
-                try:
-                    json_data = json.loads(content)
-                    parsed_data = self.parse_json_credentials(json_data, filename, message_id)
-                    processed_data.extend(parsed_data)
-                except:
-                    pass
+        total_parts = -(-size // DOWNLOAD_PART_SIZE)
+        parts_per_worker = -(-total_parts // workers)
         
-        return processed_data
-    
-    def parse_credential_data(self, content, filename, message_id):
-        """Parse credential data from text content"""
-        parsed_data = []
+        async def download_range(index):
+            position = index * parts_per_worker * DOWNLOAD_PART_SIZE
+            async for chunk in client.iter_download(
+                document,
+                offset=position,
+                request_size=DOWNLOAD_PART_SIZE,
+                limit=parts_per_worker,
+                file_size=size
+            ):
+                # No await between seek and write, so ranges cannot interleave
+                buffer.seek(position)
+                buffer.write(chunk)
+                position += len(chunk)
         
-        lines = content.split('\n')
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
+        await asyncio.gather(*(
+            download_range(i) for i in range(workers)
+            if i * parts_per_worker < total_parts
+        ))
+    
+    def iter_members(self, archive, filename):
+        """Yield (member name, binary stream) for each parseable file in the archive"""
+        try:
+            name = filename.lower()
             
-            # Common credential formats
-            # Format: email:password
-            if ':' in line and '@' in line:
-                parts = line.split(':', 1)
-                if len(parts) == 2:
-                    email = parts[0].strip()
-                    password = parts[1].strip()
-                    
-                    if '@' in email:
-                        domain = email.split('@')[1]
-                        parsed_data.append({
-                            'timestamp': datetime.now(),
-                            'filename': filename,
-                            'file_type': 'credentials',
-                            'content_type': 'email:password',
-                            'email': email,
-                            'domain': domain,
-                            'password': password,
-                            'additional_data': '',
-                            'source_message_id': message_id
-                        })
+            if name.endswith('.zip'):
+                with zipfile.ZipFile(archive, 'r') as zip_ref:
+                    infos = zip_ref.infolist()
+                    targets = self._select_members(infos, filename)
+                    for file_info in targets:
+                        with zip_ref.open(file_info) as f:
+                            yield file_info.filename, f
             
-            # Format: email;password;additional_info
-            elif ';' in line and '@' in line:
-                parts = line.split(';')
-                if len(parts) >= 2:
-                    email = parts[0].strip()
-                    password = parts[1].strip()
-                    additional = ';'.join(parts[2:]) if len(parts) > 2 else ''
-                    
-                    if '@' in email:
-                        domain = email.split('@')[1]
-                        parsed_data.append({
-                            'timestamp': datetime.now(),
-                            'filename': filename,
-                            'file_type': 'credentials',
-                            'content_type': 'email;password;info',
-                            'email': email,
-                            'domain': domain,
-                            'password': password,
-                            'additional_data': additional,
-                            'source_message_id': message_id
-                        })
+            elif name.endswith('.rar'):
+                with rarfile.RarFile(archive) as rar_ref:
+                    infos = rar_ref.infolist()
+                    targets = self._select_members(infos, filename)
+                    for file_info in targets:
+                        with rar_ref.open(file_info) as f:
+                            yield file_info.filename, f
+                            
+        except Exception as e:
+            self.logger.error(f"Error decompressing {filename}: {e}")
+    
+    def _select_members(self, infos, filename):
+        """Pick the members with a parseable extension from an archive listing"""
+        targets = [
+            info for info in infos
+            if not info.is_dir() and info.filename.lower().endswith(PARSED_EXTENSIONS)
+        ]
+        skipped = len(infos) - len(targets)
+        if skipped:
+            self.logger.info(f"Skipping {skipped} of {len(infos)} entries in {filename}")
         
-        return parsed_data
+        oversized = [info for info in targets if info.file_size > MAX_MEMBER_SIZE]
+        for info in oversized:
+            self.logger.warning(f"Skipping {info.filename} in {filename}: declared size "
+                                f"{info.file_size} exceeds {MAX_MEMBER_SIZE} bytes")
+        return [info for info in targets if info.file_size <= MAX_MEMBER_SIZE]
     
-    def parse_json_credentials(self, json_data, filename, message_id):
-        """Parse credentials from JSON data"""
-        parsed_data = []
+    def add_to_sink(self, data):
+        """Buffer records for the next batch insert into the database"""
+        if not data:
+            return
         
-        # Handle different JSON structures
-        if isinstance(json_data, list):
-            for item in json_data:
-                if isinstance(item, dict) and 'email' in item:
-                    email = item.get('email', '')
-                    if '@' in email:
-                        domain = email.split('@')[1]
-                        parsed_data.append({
-                            'timestamp': datetime.now(),
-                            'filename': filename,
-                            'file_type': 'credentials',
-                            'content_type': 'json',
-                            'email': email,
-                            'domain': domain,
-                            'password': item.get('password', ''),
-                            'additional_data': json.dumps(item),
-                            'source_message_id': message_id
-                        })
+        self._rows.extend(data)
         
-        return parsed_data
+        if len(self._rows) >= self._flush_every:
+            self._flush()
     
-    def add_to_excel(self, data):
-        """Add processed data to Excel file"""
-        if not data:
+    def _safe_last_id(self):
+        """Highest finished message ID with no unfinished message below it"""
+        if self._unfinished_ids:
+            return min(self.last_id, min(self._unfinished_ids) - 1)
+        return self.last_id
+    
+    def _flush(self):
+        """Insert buffered rows and save the cursor in one transaction"""
+        last_id = self._safe_last_id()
+        if not self._rows and last_id <= self._saved_last_id:
             return
         
         try:
-            # Read existing data
-            df_existing = pd.read_excel(self.excel_file)
-            
-            # Create new dataframe
-            df_new = pd.DataFrame(data)
-            
-            # Combine and remove duplicates
-            df_combined = pd.concat([df_existing, df_new], ignore_index=True)
-            df_combined = df_combined.drop_duplicates(subset=['email', 'password'], keep='first')
-            
-            # Save back to Excel
-            df_combined.to_excel(self.excel_file, index=False)
+            self._db.execute('BEGIN')
+            try:
+                before = self._db.total_changes
+                self._db.executemany(INSERT_CRED, self._rows)
+                added = self._db.total_changes - before
+                self._db.execute('UPDATE state SET last_id = MAX(last_id, ?)', (last_id,))
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+            self._saved_last_id = last_id
             
-            self.logger.info(f"Added {len(data)} new records to Excel")
+            if self._rows:
+                self.logger.info(f"Added {added} new records to {self.db_path} "
+                                 f"({len(self._rows) - added} duplicates skipped)")
+            self._rows = []
             
         except Exception as e:
-            self.logger.error(f"Error adding to Excel: {e}")
+            self.logger.error(f"Error writing to {self.db_path}: {e}")
 
 # Configuration
 CONFIG = {
     'api_id': YOUR_API_ID,
     'api_hash': 'YOUR_API_HASH',
     'channel_username': '@TARGET_CHANNEL',
-    'excel_file': 'observer_credentials_data.xlsx'
+    'db_path': 'credentials.db',
+    'excel_file': 'observer_credentials_data.xlsx',
+    # Optional extra session names used only for downloads, e.g.
+    # ['download1', 'download2']; each is logged in on first run, with an
+    # account that can read the channel
+    'download_sessions': [],
+    # On a new database, process the channel's whole history instead of
+    # starting from its newest message
+    'backfill_history': False
 }
 
+def export_excel(db_path, excel_file):
+    """Export the whole credentials database to an Excel file"""
+    db = sqlite3.connect(db_path)
+    try:
+        df = pd.read_sql(f"SELECT {', '.join(COLUMNS)} FROM creds", db)
+    finally:
+        db.close()
+    df.to_excel(excel_file, index=False)
+    print(f"Exported {len(df)} records to {excel_file}")
+
 async def main():
+    monitor = None
     try:
         print("Initializing Telegram Channel Monitor...")
         monitor = TelegramChannelMonitor(
             CONFIG['api_id'],
             CONFIG['api_hash'],
             CONFIG['channel_username'],
-            CONFIG['excel_file']
+            CONFIG['db_path'],
+            CONFIG['download_sessions'],
+            CONFIG['backfill_history']
         )
         
         # Test connection first
@@ -340,16 +573,27 @@ async def main():
         print(f"Error in main: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        if monitor is not None:
+            await monitor.aclose()
 
 if __name__ == "__main__":
     print("Telegram Channel Monitor - For legitimate cybersecurity research only")
     print("Ensure you have proper authorization and legal compliance")
     
     # Install required packages:
-    # pip install telethon pandas openpyxl rarfile
+    # pip install telethon cryptg orjson isal pandas openpyxl rarfile
+    # Optional, compiles the parsers to C: pip install mypy && mypyc parsers.py
     
-    # Windows asyncio
     import sys
+    
+    # Export the database to Excel instead of monitoring:
+    # python telegram_monitor.py export
+    if sys.argv[1:2] == ['export']:
+        export_excel(CONFIG['db_path'], CONFIG['excel_file'])
+        sys.exit(0)
+    
+    # Windows asyncio
     if sys.platform == 'win32':
         asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
     
@@ -0,0 +1,51 @@
+"""
+Regression tests for the credential parsers
+Run with: python -m unittest test_parsers
+"""
+
+import io
+import unittest
+
+from parsers import parse_csv_stream, parse_credential_data
+
+EMAIL, PASSWORD, ADDITIONAL = 4, 6, 7
+
+
+def parse_csv(content):
+    return parse_csv_stream(io.BytesIO(content), 'dump.csv', 1)
+
+
+class CsvParserTest(unittest.TestCase):
+    def test_colon_delimited_keeps_colons_in_password(self):
+        rows = parse_csv(b'a@b.com:pa:ss\nc@d.com:x:y:z\ne@f.com:plain\n')
+        self.assertEqual(
+            [(row[EMAIL], row[PASSWORD], row[ADDITIONAL]) for row in rows],
+            [('a@b.com', 'pa:ss', ''), ('c@d.com', 'x:y:z', ''), ('e@f.com', 'plain', '')]
+        )
+
+    def test_stray_quote_does_not_swallow_following_rows(self):
+        # The sample has a quoted field, so quoting is on for the member
+        content = (b'a@b.com,"pw"\n' + b'c@d.com,"secret\n'
+                   + b''.join(b'u%d@x.com,p%d\n' % (i, i) for i in range(20000)))
+        rows = parse_csv(content)
+        self.assertEqual(len(rows), 20002)
+        self.assertEqual(rows[0][PASSWORD], 'pw')
+        self.assertEqual(rows[1][PASSWORD], '"secret')
+        self.assertEqual((rows[-1][EMAIL], rows[-1][PASSWORD]), ('u19999@x.com', 'p19999'))
+
+    def test_quoted_fields(self):
+        rows = parse_csv(b'email,password\n"a@b.com","p,w"\n')
+        self.assertEqual([(row[EMAIL], row[PASSWORD]) for row in rows], [('a@b.com', 'p,w')])
+
+
+class TextParserTest(unittest.TestCase):
+    def test_blanks_around_separator(self):
+        rows = parse_credential_data(b'e@f.net : pw\nc@d.org ; p2 ;info\n', 'dump.txt', 1)
+        self.assertEqual(
+            [(row[EMAIL], row[PASSWORD], row[ADDITIONAL]) for row in rows],
+            [('e@f.net', 'pw', ''), ('c@d.org', 'p2', 'info')]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()